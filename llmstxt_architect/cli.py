@@ -4,16 +4,29 @@ Command-line interface for LLMsTxt Architect.
 
 import argparse
 import asyncio
+import contextlib
+import json
 import sys
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from llmstxt_architect.extractor import bs4_extractor, default_extractor
 from llmstxt_architect.main import generate_llms_txt
 from llmstxt_architect.styling import color_text, draw_box
 
 
-def parse_args() -> argparse.Namespace:
-    """Parse command-line arguments."""
+def positive_int(value: str) -> int:
+    """Argparse type for integer options that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments (from sys.argv when argv is None)."""
     parser = argparse.ArgumentParser(
         description="Generate LLMs.txt from web content using LLMs for summarization"
     )
@@ -101,7 +114,35 @@ def parse_args() -> argparse.Namespace:
         help="Content extractor to use (default: markdownify, bs4: BeautifulSoup)"
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        "--max-concurrency",
+        type=positive_int,
+        default=10,
+        help="Maximum number of summarization calls to the LLM in flight at once (default: 10)"
+    )
+    
+    parser.add_argument(
+        "--batch-prompt-size",
+        "--batch-size",
+        dest="batch_size",
+        type=positive_int,
+        default=1,
+        help="Number of pages packed into one numbered prompt per LLM call (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--llm-num-ctx",
+        type=int,
+        help="Context window size in tokens, Ollama only (default: model default)"
+    )
+    
+    parser.add_argument(
+        "--llm-num-predict",
+        type=int,
+        help="Maximum tokens generated per LLM call, Ollama only (default: model default)"
+    )
+    
+    return parser.parse_args(argv)
 
 
 def show_splash() -> None:
@@ -110,28 +151,100 @@ def show_splash() -> None:
     print()
 
 
+def generate_kwargs(args: argparse.Namespace) -> Dict[str, Any]:
+    """Map parsed CLI arguments to generate_llms_txt keyword arguments."""
+    # Map extractor choice to function (these are coroutines, will be awaited internally)
+    extractor_map = {
+        "default": default_extractor,
+        "bs4": bs4_extractor
+    }
+    
+    return dict(
+        # If using existing llms file but no URLs specified, will extract from file
+        urls=args.urls or [],
+        max_depth=args.max_depth,
+        llm_name=args.llm_name,
+        llm_provider=args.llm_provider,
+        project_dir=args.project_dir,
+        output_dir=args.output_dir,
+        output_file=args.output_file,
+        summary_prompt=args.summary_prompt,
+        blacklist_file=args.blacklist_file,
+        extractor=extractor_map[args.extractor],
+        existing_llms_file=args.existing_llms_file,
+        update_descriptions_only=args.update_descriptions_only,
+        max_concurrency=args.max_concurrency,
+        batch_size=args.batch_size,
+        llm_num_ctx=args.llm_num_ctx,
+        llm_num_predict=args.llm_num_predict,
+    )
+
+
+def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one serve job and return its result.
+    
+    Args:
+        job: Mapping with "args", the CLI arguments for this run, and an optional "id"
+        
+    Returns:
+        Mapping with the job's "id", "ok" and, on failure, "error"
+    """
+    result: Dict[str, Any] = {"id": job.get("id"), "ok": False}
+    try:
+        args = parse_args(job.get("args", []))
+        if args.update_descriptions_only and not args.existing_llms_file:
+            result["error"] = "--update-descriptions-only requires --existing-llms-file"
+            return result
+        asyncio.run(generate_llms_txt(**generate_kwargs(args)))
+        result["ok"] = True
+    except SystemExit:
+        # argparse has already printed the usage error
+        result["error"] = "invalid arguments"
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def serve() -> None:
+    """
+    Read JSON jobs from stdin, one per line, and write one JSON result per line to stdout.
+    
+    Keeping one process alive avoids paying interpreter and library start-up for every run.
+    Progress output from jobs goes to stderr so stdout only carries results.
+    """
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:  # Includes json.JSONDecodeError
+            result = {"id": None, "ok": False, "error": f"Invalid job: {e}"}
+        else:
+            with contextlib.redirect_stdout(sys.stderr):
+                result = run_job(job)
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
 def main() -> None:
     """Main entry point for the CLI."""
+    if sys.argv[1:2] == ["serve"]:
+        serve()
+        return
+    
     args = parse_args()
     
     # Show splash screen
     show_splash()
     
-    # Map extractor choice to function (these are coroutines, will be awaited internally)
-    extractor_map = {
-        "default": default_extractor,
-        "bs4": bs4_extractor
-    }
-    extractor_func = extractor_map[args.extractor]
-    
     # Handle update-descriptions-only flag (requires existing-llms-file)
     if args.update_descriptions_only and not args.existing_llms_file:
         print(color_text("Error: --update-descriptions-only requires --existing-llms-file", "red"))
         sys.exit(1)
         
-    # If using existing llms file but no URLs specified, will extract from file
-    urls = args.urls or []
-    
     # Print status message for clarity
     if args.existing_llms_file:
         print(color_text(f"Using existing llms file: {args.existing_llms_file}", "blue"))
@@ -139,20 +252,7 @@ def main() -> None:
             print(color_text("Mode: Update descriptions only (preserving structure)", "blue"))
     
     try:
-        asyncio.run(generate_llms_txt(
-            urls=urls,
-            max_depth=args.max_depth,
-            llm_name=args.llm_name,
-            llm_provider=args.llm_provider,
-            project_dir=args.project_dir,
-            output_dir=args.output_dir,
-            output_file=args.output_file,
-            summary_prompt=args.summary_prompt,
-            blacklist_file=args.blacklist_file,
-            extractor=extractor_func,
-            existing_llms_file=args.existing_llms_file,
-            update_descriptions_only=args.update_descriptions_only,
-        ))
+        asyncio.run(generate_llms_txt(**generate_kwargs(args)))
     except KeyboardInterrupt:
         print(color_text("\nOperation cancelled by user.", "yellow"))
         sys.exit(1)
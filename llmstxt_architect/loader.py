@@ -3,15 +3,29 @@ URL loading and document processing.
 """
 
 import asyncio
+import contextlib
+import html
 import httpx
+import importlib.util
 import re
 import time
 from collections import OrderedDict
-from typing import Callable, Dict, List, Optional, Tuple, Set
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Set
 from urllib.parse import urlparse
 
-from langchain_community.document_loaders import RecursiveUrlLoader
 from langchain.schema import Document
+from langchain_core.utils.html import extract_sub_links
+
+# Markdown link "[title](url)" with an http(s) URL. The title may contain one level of
+# brackets, e.g. "[Foo [beta]](url)"; the alternatives never overlap, so matching cannot backtrack badly
+MD_LINK_PATTERN = r'\[((?:[^\[\]\n]|\[[^\]\n]*\])*)\]\((https?://[^\s)]+)\)'
+MD_LINK_RE = re.compile(MD_LINK_PATTERN)
+
+# Maximum number of concurrent page fetches (and pooled connections) while loading URLs
+FETCH_CONCURRENCY = 16
+
+# HTTP/2 multiplexes requests to one host over a single connection; it needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
 
 async def load_urls(
@@ -38,47 +52,114 @@ async def load_urls(
         if urls_from_file:
             urls = urls_from_file
     
-    docs = []
-    processed_count = 0
-    total_urls = len(urls)
-    
     # Use direct URL loading for existing llms.txt files (more efficient)
     if existing_llms_file:
         docs = await load_urls_directly(urls, extractor)
     else:
-        # Use recursive loader for standard URL crawling
-        for url in urls:
-            try:
-                loader = RecursiveUrlLoader(
-                    url,
-                    max_depth=max_depth,
-                    extractor=extractor,
-                )
-
-                # Load documents using lazy loading (memory efficient)
-                docs_lazy = loader.lazy_load()
-
-                # Load documents and track URLs
-                url_docs = []
-                for d in docs_lazy:
-                    url_docs.append(d)
-                    
+        # Crawl every URL concurrently over one connection pool, sharing visited pages
+        docs = []
+        processed_count = 0
+        total_urls = len(urls)
+        visited: Set[str] = set()
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+        
+        async with _make_client() as client:
+            
+            async def crawl(url: str) -> List[Document]:
+                nonlocal processed_count
+                try:
+                    return await crawl_url(client, semaphore, url, max_depth, extractor, visited)
+                except Exception as e:
+                    print(f"Error loading URL {url}: {str(e)}")
+                    return []
+                finally:
+                    # Update progress
+                    processed_count += 1
+                    if processed_count % 10 == 0 or processed_count == total_urls:
+                        print(f"Progress: {processed_count}/{total_urls} URLs processed")
+            
+            for url_docs in await asyncio.gather(*(crawl(url) for url in urls)):
                 docs.extend(url_docs)
-                
-                # Update progress
-                processed_count += 1
-                if processed_count % 10 == 0 or processed_count == total_urls:
-                    print(f"Progress: {processed_count}/{total_urls} URLs processed")
-                    
-            except Exception as e:
-                print(f"Error loading URL {url}: {str(e)}")
-                continue
 
     print(f"\nLoaded {len(docs)} documents.")
     
     return docs
 
 
+def _make_client() -> httpx.AsyncClient:
+    """Create the HTTP client shared by all fetches, using HTTP/2 when h2 is installed."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(30.0),  # 30 seconds
+        limits=httpx.Limits(
+            max_connections=FETCH_CONCURRENCY,
+            max_keepalive_connections=FETCH_CONCURRENCY,
+        ),
+        http2=HTTP2_AVAILABLE,
+        follow_redirects=True,
+    )
+
+
+async def crawl_url(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    url: str,
+    max_depth: int,
+    extractor: Callable[[str], str] = None,
+    visited: Optional[Set[str]] = None,
+) -> List[Document]:
+    """
+    Crawl a URL breadth-first, fetching each level of child links concurrently.
+    
+    Follows the same rules as LangChain's RecursiveUrlLoader: max_depth=1 loads only the
+    URL itself, max_depth=2 adds the pages it links to, and so on. Only links on the same
+    host are followed, and pages with empty extracted content are skipped.
+    
+    Args:
+        client: HTTPX client to use
+        semaphore: Semaphore bounding concurrent fetches
+        url: URL to start crawling from
+        max_depth: Maximum crawl depth
+        extractor: Function to extract content from HTML
+        visited: URLs already fetched (updated in place), to avoid loading a page twice
+        
+    Returns:
+        List of loaded documents
+    """
+    if visited is None:
+        visited = set()
+    parsed = urlparse(url)
+    base_url = f"{parsed.scheme}://{parsed.netloc}/"
+    
+    docs = []
+    level = [url] if url not in visited else []
+    visited.update(level)
+    for depth in range(max_depth):
+        if not level:
+            break
+        responses = await asyncio.gather(*(_get(client, semaphore, page_url) for page_url in level))
+        
+        next_level = []
+        for page_url, response in zip(level, responses):
+            if response is None:
+                continue
+                
+            doc = _to_document(page_url, response, extractor)
+            if doc.page_content:
+                docs.append(doc)
+                
+            # Queue unvisited child links for the next level
+            if depth < max_depth - 1:
+                for link in extract_sub_links(
+                    response.text, page_url, base_url=base_url, continue_on_failure=True
+                ):
+                    if link not in visited:
+                        visited.add(link)
+                        next_level.append(link)
+        level = next_level
+        
+    return docs
+
+
 async def load_urls_directly(urls: List[str], extractor: Callable[[str], str] = None) -> List[Document]:
     """
     Load URLs directly without recursion. More efficient for existing llms.txt files.
@@ -90,86 +171,97 @@ async def load_urls_directly(urls: List[str], extractor: Callable[[str], str] =
     Returns:
         List of Document objects
     """
-    docs = []
-    errors = []
-    successful = 0
-    duplicates_avoided = 0
-    
-    # Track URLs we've already processed to avoid duplicates
+    # Deduplicate URLs before processing
     # Use normalized URLs for comparison
     processed_urls = set()
-    
-    # Configure client with reasonable defaults
-    timeout = httpx.Timeout(30.0)  # 30 seconds
-    limits = httpx.Limits(max_connections=10)  # Limit concurrent connections
-    
-    # Process URLs in batches to avoid overwhelming the system
-    batch_size = 10
-    
-    # Deduplicate URLs before processing
-    unique_batches = []
-    for i in range(0, len(urls), batch_size):
-        batch = urls[i:i+batch_size]
-        unique_batch = []
-        
-        for url in batch:
-            normalized_url = normalize_url(url)
-            if normalized_url not in processed_urls:
-                unique_batch.append(url)
-                processed_urls.add(normalized_url)
-            else:
-                duplicates_avoided += 1
-                
-        if unique_batch:
-            unique_batches.append(unique_batch)
+    unique_urls = []
+    for url in urls:
+        normalized_url = normalize_url(url)
+        if normalized_url not in processed_urls:
+            unique_urls.append(url)
+            processed_urls.add(normalized_url)
+    duplicates_avoided = len(urls) - len(unique_urls)
     
     # Report deduplication results
     if duplicates_avoided > 0:
         print(f"Avoiding {duplicates_avoided} duplicate URLs during loading")
     
-    print(f"Loading {len(processed_urls)} unique URLs (batch size: {batch_size})...")
+    print(f"Loading {len(unique_urls)} unique URLs (concurrency: {FETCH_CONCURRENCY})...")
+    
+    processed_count = 0
+    semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
     
-    # Process each batch of unique URLs
-    for batch in unique_batches:
-        batch_docs = []
+    # Fetch all URLs concurrently over one connection pool, bounded by the semaphore
+    async with _make_client() as client:
         
-        # Create tasks to fetch URLs concurrently
-        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
-            tasks = []
-            for url in batch:
-                tasks.append(fetch_url(client, url, extractor))
-            
-            # Process the batch concurrently
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def load(url: str) -> Optional[Document]:
+            nonlocal processed_count
+            doc = await fetch_url(client, url, extractor, semaphore)
             
-            # Process results
-            for result, url in zip(results, batch):
-                if isinstance(result, Exception):
-                    errors.append((url, str(result)))
-                    continue
-                
-                if result:
-                    batch_docs.append(result)
-                    successful += 1
+            # Report progress
+            processed_count += 1
+            if processed_count % 10 == 0 or processed_count == len(unique_urls):
+                print(f"Progress: {processed_count}/{len(unique_urls)} unique URLs processed")
+            return doc
         
-        # Add batch results to main list
-        docs.extend(batch_docs)
-        
-        # Report progress
-        processed_so_far = min(successful + len(errors), len(processed_urls))
-        print(f"Progress: {processed_so_far}/{len(processed_urls)} unique URLs processed")
+        results = await asyncio.gather(*(load(url) for url in unique_urls))
+    
+    docs = [doc for doc in results if doc is not None]
     
     # Report final results
-    print(f"Successfully loaded {successful} URLs")
-    if errors:
-        print(f"Failed to load {len(errors)} URLs")
+    print(f"Successfully loaded {len(docs)} URLs")
+    if len(docs) < len(unique_urls):
+        print(f"Failed to load {len(unique_urls) - len(docs)} URLs")
     if duplicates_avoided > 0:
         print(f"Avoided processing {duplicates_avoided} duplicate URLs (token saving)")
     
     return docs
 
 
-async def fetch_url(client: httpx.AsyncClient, url: str, extractor: Callable[[str], str]) -> Optional[Document]:
+async def _get(
+    client: httpx.AsyncClient, semaphore: Optional[asyncio.Semaphore], url: str
+) -> Optional[httpx.Response]:
+    """Fetch a URL, holding the semaphore if given. Returns None (after printing the error) on failure."""
+    try:
+        async with semaphore if semaphore is not None else contextlib.nullcontext():
+            # Add a small delay to avoid hammering servers
+            await asyncio.sleep(0.1)
+            
+            response = await client.get(url)
+        response.raise_for_status()
+        return response
+    except Exception as e:
+        print(f"Error fetching {url}: {str(e)}")
+        return None
+
+
+def _to_document(url: str, response: httpx.Response, extractor: Callable[[str], str]) -> Document:
+    """Convert a fetched page to a Document."""
+    # Extract page title
+    title = extract_title(response.text) or url.rpartition('/')[2]
+    
+    # Extract content
+    if extractor:
+        content = extractor(response.text)
+    else:
+        content = response.text
+    
+    # Create document
+    return Document(
+        page_content=content,
+        metadata={
+            "source": url,
+            "title": title
+        }
+    )
+
+
+async def fetch_url(
+    client: httpx.AsyncClient,
+    url: str,
+    extractor: Callable[[str], str],
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> Optional[Document]:
     """
     Fetch a single URL and convert it to a Document.
     
@@ -177,45 +269,39 @@ async def fetch_url(client: httpx.AsyncClient, url: str, extractor: Callable[[st
         client: HTTPX client to use
         url: URL to fetch
         extractor: Function to extract content from HTML
+        semaphore: Optional semaphore bounding concurrent fetches
         
     Returns:
         Document object or None if failed
     """
+    response = await _get(client, semaphore, url)
+    if response is None:
+        return None
     try:
-        # Add a small delay to avoid hammering servers
-        await asyncio.sleep(0.1)
-        
-        # Fetch URL
-        response = await client.get(url, follow_redirects=True)
-        response.raise_for_status()
-        
-        # Extract page title
-        title = extract_title(response.text) or url.split('/')[-1]
-        
-        # Extract content
-        if extractor:
-            content = extractor(response.text)
-        else:
-            content = response.text
-        
-        # Create document
-        return Document(
-            page_content=content,
-            metadata={
-                "source": url,
-                "title": title
-            }
-        )
+        return _to_document(url, response, extractor)
     except Exception as e:
         print(f"Error fetching {url}: {str(e)}")
         return None
 
 
+def iter_md_links(text: str) -> Iterator[Tuple[str, str]]:
+    """
+    Iterate over the markdown links in text.
+    
+    Args:
+        text: Text to scan, e.g. an llms.txt line or a summary entry
+        
+    Yields:
+        (title, url) for each "[title](url)" link with an http(s) URL
+    """
+    yield from (match.groups() for match in MD_LINK_RE.finditer(text))
+
+
 def extract_title(html_content: str) -> Optional[str]:
     """Extract title from HTML content."""
     title_match = re.search(r'<title>(.*?)</title>', html_content, re.IGNORECASE | re.DOTALL)
     if title_match:
-        return title_match.group(1).strip()
+        return html.unescape(title_match.group(1)).strip()
     return None
 
 
@@ -232,7 +318,6 @@ async def extract_urls_from_llms_file(file_path: str) -> List[str]:
     """
     # Use OrderedDict to preserve order while deduplicating
     unique_urls = OrderedDict()
-    url_pattern = re.compile(r'\[(.*?)\]\((https?://[^\s)]+)\)')
     
     try:
         # Check if the input is a URL or a local file path
@@ -247,7 +332,7 @@ async def extract_urls_from_llms_file(file_path: str) -> List[str]:
             source_desc = f"local file: {file_path}"
         
         # Parse URLs from content
-        matches = url_pattern.findall(content)
+        matches = list(iter_md_links(content))
         
         # Process URLs, normalizing and deduplicating
         for match in matches:
@@ -293,6 +378,28 @@ async def fetch_llms_txt_from_url(url: str) -> str:
         raise Exception(f"Failed to fetch llms.txt from URL {url}: {str(e)}")
 
 
+async def stream_llms_txt_lines_from_url(url: str) -> AsyncIterator[str]:
+    """
+    Stream llms.txt content from a URL line by line, without holding the whole file in memory.
+    
+    Args:
+        url: URL to fetch llms.txt from
+        
+    Yields:
+        Lines of the llms.txt file
+    """
+    try:
+        print(f"Fetching llms.txt from remote URL: {url}")
+        timeout = httpx.Timeout(30.0)
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            async with client.stream("GET", url, follow_redirects=True) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    yield line
+    except Exception as e:
+        raise Exception(f"Failed to fetch llms.txt from URL {url}: {str(e)}")
+
+
 def normalize_url(url: str) -> str:
     """
     Normalize URL for comparison and deduplication.
@@ -352,7 +459,6 @@ def parse_existing_llms_file_content(lines: List[str], source_desc: str = "conte
     """
     url_to_description = {}
     file_structure = []
-    url_pattern = re.compile(r'\[(.*?)\]\((https?://[^\s)]+)\)')
     
     for line in lines:
         file_structure.append(line)
@@ -363,7 +469,7 @@ def parse_existing_llms_file_content(lines: List[str], source_desc: str = "conte
             continue
             
         # Check if line contains a URL
-        match = url_pattern.search(line_stripped)
+        match = MD_LINK_RE.search(line_stripped)
         if match:
             title = match.group(1)
             url = match.group(2)
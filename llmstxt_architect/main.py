@@ -31,6 +31,10 @@ async def generate_llms_txt(
     blacklist_file: str = None,
     existing_llms_file: Optional[str] = None,
     update_descriptions_only: bool = False,
+    max_concurrency: int = 10,
+    batch_size: int = 1,
+    llm_num_ctx: Optional[int] = None,
+    llm_num_predict: Optional[int] = None,
 ) -> None:
     """
     Generate an llms.txt file from a list of URLs.
@@ -48,6 +52,10 @@ async def generate_llms_txt(
         blacklist_file: Path to a file containing blacklisted URLs to exclude (one per line)
         existing_llms_file: Path to an existing llms.txt file to extract URLs and structure from
         update_descriptions_only: If True, preserve the existing file structure and only update descriptions
+        max_concurrency: Maximum number of summarization calls to the LLM in flight at once
+        batch_size: Number of documents summarized with a single LLM call
+        llm_num_ctx: Context window size in tokens (Ollama only)
+        llm_num_predict: Maximum tokens to generate per LLM call (Ollama only)
     """
     # Start timing
     start_time = time.time()
@@ -111,6 +119,8 @@ async def generate_llms_txt(
         output_dir=str(summaries_path),
         blacklist_file=blacklist_file,
         existing_llms_file=existing_llms_file if update_descriptions_only else None,
+        llm_num_ctx=llm_num_ctx,
+        llm_num_predict=llm_num_predict,
     )
     
     # Run async post-initialization
@@ -119,7 +129,9 @@ async def generate_llms_txt(
     # Generate summaries
     try:
         print(status_message("Generating summaries...", "processing"))
-        summaries = await summarizer.summarize_all(docs)
+        summaries = await summarizer.summarize_all(
+            docs, max_concurrency=max_concurrency, batch_size=batch_size
+        )
         stats["summaries_generated"] = len(summaries)
     except Exception as e:
         print(status_message(f"Summarization process was interrupted: {str(e)}", "error"))
@@ -2,14 +2,96 @@
 LLM-based summarization of web page content.
 """
 
+import asyncio
+import hashlib
 import json
 import os
 import re
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Union
+from urllib.parse import urlparse
 
 from langchain.chat_models import init_chat_model
 
+from llmstxt_architect.loader import MD_LINK_PATTERN, iter_md_links, stream_llms_txt_lines_from_url
+
+# Response cache mode for summaries generated from a single-page prompt
+SINGLE_PROMPT_MODE = "single"
+
+# Maximum characters of page content included per page in a batched prompt
+BATCH_PAGE_MAX_CHARS = 4000
+
+# Conservative characters per token (most text averages more), used to fit prompts
+# into a configured context window
+CHARS_PER_TOKEN = 3
+# Tokens reserved for the summary instructions and [n] markers
+PROMPT_OVERHEAD_TOKENS = 128
+# Minimum characters of each page a prompt must include; batches are made smaller to keep it
+PAGE_MIN_CHARS = 500
+
+# Numbered delimiter "[n]" that starts each document in a batched prompt and each summary in the response
+_BATCH_MARKER_RE = re.compile(r'^[ \t]*\[(\d+)\][ \t]*', re.MULTILINE)
+
+# Number of new summaries recorded before summarized_urls.json is rewritten
+LOG_FLUSH_INTERVAL = 10
+
+# How long Ollama keeps the model loaded between calls, so it is not reloaded for every summary
+OLLAMA_KEEP_ALIVE = "10m"
+
+# Markdown link pattern on bytes, to find the URL in summary files without decoding them
+_URL_RE_B = re.compile(MD_LINK_PATTERN.encode())
+
+# Blacklist entries ending with this suffix exclude the URL and every page below it
+BLACKLIST_PREFIX_SUFFIX = "/*"
+
+# Marks the end of a blacklisted prefix in the blacklist trie (cannot appear in a URL segment)
+_TRIE_END = "\x00"
+
+# Characters replaced when turning a URL into a summary filename
+_FILENAME_TRANSLATION = str.maketrans({"/": "_", "\\": "_", ":": "_"})
+
+
+@lru_cache(maxsize=4096)
+def _summary_filename(url: str) -> str:
+    """Generate a filename for the summary based on the URL (pure, so results are cached)."""
+    # Create a valid filename from the URL in a single translate pass
+    parsed = urlparse(url)
+    filename = f"{parsed.netloc}{parsed.path}".translate(_FILENAME_TRANSLATION)
+    return filename if filename.endswith('.txt') else filename + '.txt'
+
+
+def _write_atomic(path: str, payload: Union[str, bytes]) -> None:
+    """Write payload to a temporary file and rename it over path, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb' if isinstance(payload, bytes) else 'w') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def _write_text_files(files: List[Tuple[Path, str]]) -> None:
+    """Write each (path, content) pair; run in a worker thread to keep disk I/O off the event loop."""
+    for path, content in files:
+        with open(path, 'w') as f:
+            f.write(content)
+
+
+def _read_text_file(path: Path) -> Optional[str]:
+    """Read a text file, or return None if it does not exist."""
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _first_md_link_url(text: str) -> Optional[str]:
+    """Return the URL of the first markdown link in text, if any."""
+    link = next(iter_md_links(text), None)
+    return link[1] if link else None
+
+
 class Summarizer:
     """Handles the summarization of web page content using specified LLM."""
     
@@ -21,6 +103,8 @@ class Summarizer:
         output_dir: str = "summaries",
         blacklist_file: str = None,
         existing_llms_file: str = None,
+        llm_num_ctx: Optional[int] = None,
+        llm_num_predict: Optional[int] = None,
     ) -> None:
         """
         Initialize the summarizer.
@@ -32,27 +116,54 @@ class Summarizer:
             output_dir: Directory to save summaries
             blacklist_file: Path to a file containing blacklisted URLs (one per line)
             existing_llms_file: Path to an existing llms.txt file to preserve structure from
+            llm_num_ctx: Context window size in tokens (Ollama only; model default if None)
+            llm_num_predict: Maximum tokens to generate per call (Ollama only; model default if None)
         """
         self.llm_name = llm_name
         self.llm_provider = llm_provider
+        self.llm_num_ctx = llm_num_ctx
+        self.llm_num_predict = llm_num_predict
         self.summary_prompt = summary_prompt
+        
+        # Reject context settings that leave no room for the page itself
+        if self.llm_num_ctx is not None and self._page_max_chars() < PAGE_MIN_CHARS:
+            raise ValueError(
+                f"A context window of {self.llm_num_ctx} tokens leaves less than {PAGE_MIN_CHARS} "
+                f"characters of page content after the summary prompt and {self.llm_num_predict or 0} "
+                "response tokens; increase llm_num_ctx or lower llm_num_predict"
+            )
         self.output_dir = Path(output_dir)
         self.log_file = self.output_dir / "summarized_urls.json"
+        self.cache_dir = self.output_dir / "cache"  # LLM responses keyed by prompt and content hash
         self.blacklist_file = blacklist_file
         self.existing_llms_file = existing_llms_file
         self.url_titles = {}  # Map of URLs to their titles from existing file
         
-        # Create output directory if it doesn't exist
+        # Create output and response cache directories if they don't exist
         os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
         
         # Initialize the LLM
         self.llm = self._init_llm()
         
         # Load the log of already summarized URLs
         self.summarized_urls = self._load_log()
+        self._unsaved_log_entries = 0
+        self._log_lock = asyncio.Lock()  # Serializes log writes running in worker threads
+        
+        # Load blacklisted URLs (a frozenset, so membership checks are hash lookups)
+        # and blacklisted prefixes (a trie of URL path segments)
+        self.blacklisted_urls, self._blacklist_trie = self._load_blacklist()
+        self._blacklist_set = self.blacklisted_urls
         
-        # Load blacklisted URLs
-        self.blacklisted_urls = self._load_blacklist()
+        # Scan existing summary files once; new summaries are added as they are saved
+        self._summary_cache: Dict[str, Tuple[Optional[str], bytes]] = self._read_summary_files()
+        
+        # Longest non-blacklisted summary per normalized URL, as (filename, content),
+        # kept up to date so progress updates only need to sort and write
+        self._unique_by_url: Dict[str, Tuple[str, bytes]] = {}
+        for filename, (url, content) in self._summary_cache.items():
+            self._update_unique_entry(filename, url, content)
         
         # Parse existing llms.txt file if provided - handled in __post_init__
         self.existing_llms_file = existing_llms_file
@@ -65,7 +176,14 @@ class Summarizer:
         
     def _init_llm(self):
         """Initialize the LLM based on provider and model name."""
-        return init_chat_model(model=self.llm_name, model_provider=self.llm_provider)
+        llm_kwargs = {}
+        if self.llm_provider == "ollama":
+            llm_kwargs["keep_alive"] = OLLAMA_KEEP_ALIVE
+            if self.llm_num_ctx is not None:
+                llm_kwargs["num_ctx"] = self.llm_num_ctx
+            if self.llm_num_predict is not None:
+                llm_kwargs["num_predict"] = self.llm_num_predict
+        return init_chat_model(model=self.llm_name, model_provider=self.llm_provider, **llm_kwargs)
         
     def _load_log(self) -> Dict[str, str]:
         """Load the log of already summarized URLs."""
@@ -75,9 +193,18 @@ class Summarizer:
         with open(self.log_file, 'r') as f:
             return json.load(f)
             
-    def _load_blacklist(self) -> List[str]:
-        """Load blacklisted URLs from a file."""
-        blacklisted_urls = []
+    def _load_blacklist(self) -> Tuple[FrozenSet[str], Dict[str, dict]]:
+        """
+        Load blacklisted URLs from a file.
+        
+        Entries ending with BLACKLIST_PREFIX_SUFFIX ("/*") blacklist a URL prefix and are
+        stored in a trie of URL segments; all other entries are matched exactly.
+        
+        Returns:
+            Tuple of (exact blacklisted URLs, trie of blacklisted URL prefixes)
+        """
+        blacklisted_urls: FrozenSet[str] = frozenset()
+        blacklist_trie: Dict[str, dict] = {}
         
         if self.blacklist_file and os.path.exists(self.blacklist_file):
             with open(self.blacklist_file, 'r') as f:
@@ -85,27 +212,78 @@ class Summarizer:
                 urls = [line.strip() for line in f.readlines()]
                 urls = [url for url in urls if url and not url.startswith('#')]
                 
-                # Normalize URLs by removing trailing slashes
-                blacklisted_urls = [url.rstrip('/') for url in urls]
+            prefixes = [url[:-len(BLACKLIST_PREFIX_SUFFIX)] for url in urls if url.endswith(BLACKLIST_PREFIX_SUFFIX)]
+            
+            # Normalize URLs by removing trailing slashes
+            blacklisted_urls = frozenset(
+                url.rstrip('/') for url in urls if not url.endswith(BLACKLIST_PREFIX_SUFFIX)
+            )
+            for prefix in prefixes:
+                node = blacklist_trie
+                for segment in prefix.rstrip('/').split('/'):
+                    node = node.setdefault(segment, {})
+                node[_TRIE_END] = {}
                 
             print(f"Loaded {len(blacklisted_urls)} blacklisted URLs from {self.blacklist_file}")
+            if prefixes:
+                print(f"Loaded {len(prefixes)} blacklisted URL prefixes from {self.blacklist_file}")
+        
+        return blacklisted_urls, blacklist_trie
         
-        return blacklisted_urls
+    def _is_blacklisted(self, url: str) -> bool:
+        """Check whether a URL is blacklisted exactly or lies under a blacklisted prefix."""
+        normalized_url = url.rstrip('/')
+        if normalized_url in self._blacklist_set:
+            return True
+        if not self._blacklist_trie:
+            return False
+            
+        # Walk the URL segments; reaching the end of any blacklisted prefix is a match
+        node = self._blacklist_trie
+        for segment in normalized_url.split('/'):
+            if _TRIE_END in node:
+                return True
+            node = node.get(segment)
+            if node is None:
+                return False
+        return _TRIE_END in node
             
-    def _save_log(self) -> None:
+    def _read_summary_files(self) -> Dict[str, Tuple[Optional[str], bytes]]:
+        """
+        Read all summary files from the output directory.
+        
+        Content is kept as UTF-8 bytes and only decoded where it is needed as text.
+        
+        Returns:
+            Map of summary filename to (URL extracted from the summary or None, content)
+        """
+        summary_files = {}
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.txt') and entry.is_file():
+                    with open(entry.path, 'rb') as f:
+                        content = f.read()
+                    match = _URL_RE_B.search(content)
+                    url = match.group(2).decode('utf-8', errors='replace') if match else None
+                    summary_files[entry.name] = (url, content)
+        return summary_files
+        
+    async def _save_log(self) -> None:
         """Save the log of summarized URLs."""
-        with open(self.log_file, 'w') as f:
-            json.dump(self.summarized_urls, f, indent=2)
+        # Serialize on the event loop so the log cannot change while the worker thread writes it
+        payload = json.dumps(self.summarized_urls, separators=(',', ':'))
+        self._unsaved_log_entries = 0
+        async with self._log_lock:
+            await asyncio.to_thread(_write_atomic, str(self.log_file), payload)
+        
+    async def _flush_log(self) -> None:
+        """Save the log of summarized URLs if it has unsaved entries."""
+        if self._unsaved_log_entries:
+            await self._save_log()
             
     def _get_summary_filename(self, url: str) -> str:
         """Generate a filename for the summary based on the URL."""
-        # Create a valid filename from the URL
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        filename = f"{parsed.netloc}{parsed.path}".replace("/", "_")
-        if not filename.endswith('.txt'):
-            filename += '.txt'
-        return filename
+        return _summary_filename(url)
     
     async def _parse_existing_file_titles(self) -> None:
         """
@@ -113,223 +291,462 @@ class Summarizer:
         This helps preserve titles when updating only descriptions.
         Can handle both local files and remote URLs.
         """
-        url_pattern = re.compile(r'\[(.*?)\]\((https?://[^\s)]+)\)')
-        
         try:
             # Check if the input is a URL or a local file path
             if self.existing_llms_file.startswith(('http://', 'https://')):
-                # Handle remote URL
-                from llmstxt_architect.loader import fetch_llms_txt_from_url
+                # Handle remote URL, streaming its lines
                 try:
-                    content = await fetch_llms_txt_from_url(self.existing_llms_file)
+                    async for line in stream_llms_txt_lines_from_url(self.existing_llms_file):
+                        self._add_url_titles(line)
                     source_desc = f"remote URL: {self.existing_llms_file}"
                 except Exception as e:
                     print(f"Error fetching titles from remote llms.txt file: {str(e)}")
                     return
             else:
-                # Handle local file
+                # Handle local file line by line instead of reading it whole
                 with open(self.existing_llms_file, 'r') as f:
-                    content = f.read()
+                    for line in f:
+                        self._add_url_titles(line)
                 source_desc = f"local file: {self.existing_llms_file}"
-            
-            # Extract titles from content
-            matches = url_pattern.findall(content)
-            
-            for title, url in matches:
-                self.url_titles[url] = title
                 
             print(f"Extracted {len(self.url_titles)} URL titles from llms.txt ({source_desc})")
         except Exception as e:
             print(f"Error parsing URL titles from existing file: {str(e)}")
             
-    async def summarize_document(self, doc) -> Optional[str]:
+    def _add_url_titles(self, line: str) -> None:
+        """Record the title of every markdown link on a line of an llms.txt file."""
+        for title, url in iter_md_links(line):
+            self.url_titles[url] = title
+            
+    async def _get_existing_summary(
+        self, doc, cache_modes: Tuple[str, ...] = (SINGLE_PROMPT_MODE,)
+    ) -> Tuple[bool, Optional[str]]:
         """
-        Summarize a document.
+        Check whether a document can be skipped without calling the LLM.
         
         Args:
-            doc: Document to summarize
+            doc: Document to check
+            cache_modes: Prompt modes whose cached responses may be reused, in order of preference
             
         Returns:
-            Summary of the document
+            Tuple of (skip, summary) where summary is the previously saved summary, if any
         """
         url = doc.metadata.get('source', '')
         
-        # Normalize URL for comparison
-        normalized_url = url.rstrip('/')
-        
         # Check if URL is blacklisted
-        if normalized_url in self.blacklisted_urls:
+        if self._is_blacklisted(url):
             print(f"Skipping blacklisted URL: {url}")
-            return None
+            return True, None
         
         # Check if already summarized
         if url in self.summarized_urls:
             print(f"Already summarized: {url}")
             
-            # Return the summary from file
-            summary_path = self.output_dir / self.summarized_urls[url]
-            if summary_path.exists():
-                with open(summary_path, 'r') as f:
-                    return f.read()
+            # Return the summary saved for this URL, if its file exists
+            cached = self._summary_cache.get(self.summarized_urls[url])
+            return True, cached[1].decode('utf-8') if cached else None
+        
+        # Reuse the LLM response for an unchanged page, model and prompt
+        for cache_mode in cache_modes:
+            cached_response = await asyncio.to_thread(_read_text_file, self._response_cache_path(doc, cache_mode))
+            if cached_response is not None:
+                print(f"Using cached summary: {url}")
+                return True, await self._save_summary(doc, cached_response, cache_mode=None)
+        
+        return False, None
+        
+    def _batch_prompt_mode(self, batch_size: int) -> str:
+        """Response cache mode for summaries generated from batched prompts of batch_size pages."""
+        return f"batch{batch_size}"
+        
+    def _response_cache_path(self, doc, cache_mode: str = SINGLE_PROMPT_MODE) -> Path:
+        """
+        Path of the cached LLM response for a document.
+        
+        The key hashes the provider, model, context settings (which decide how much of the page
+        is sent), prompt mode (single page or batch size), prompt and page content, so a response
+        is only reused when it would be generated the same way.
+        """
+        key_parts = (
+            self.llm_provider, self.llm_name, str(self.llm_num_ctx), str(self.llm_num_predict),
+            cache_mode, self.summary_prompt, doc.page_content,
+        )
+        key = hashlib.blake2b("\x00".join(key_parts).encode('utf-8'), digest_size=16).hexdigest()
+        return self.cache_dir / f"{key}.txt"
+        
+    async def _save_summary(self, doc, summary: str, cache_mode: Optional[str] = SINGLE_PROMPT_MODE) -> str:
+        """
+        Format a generated summary, save it to its own file and record it in the log.
+        
+        Args:
+            doc: Document that was summarized
+            summary: Raw summary returned by the LLM
+            cache_mode: Prompt mode the summary was generated with, to store the raw summary
+                in the response cache (None to skip caching)
+            
+        Returns:
+            Formatted llms.txt entry for the document
+        """
+        url = doc.metadata.get('source', '')
+        
+        # Extract page title or use URL as fallback
+        # If we have a title from existing file, use that instead to preserve it
+        if url in self.url_titles:
+            title = self.url_titles[url]
+        else:
+            title = doc.metadata.get('title') or url.rpartition('/')[2] or url
+        
+        # Format summary entry - ensure no extra newlines within the summary
+        clean_summary = summary.replace('\n\n', ' ').replace('\n', ' ').strip()
+        formatted_summary = f"[{title}]({url}): {clean_summary}\n\n"
+        
+        # Save individual summary (and the raw response cache entry) off the event loop
+        filename = self._get_summary_filename(url)
+        files = [(self.output_dir / filename, formatted_summary)]
+        if cache_mode is not None:
+            files.append((self._response_cache_path(doc, cache_mode), summary))
+        await asyncio.to_thread(_write_text_files, files)
+            
+        # Update log (saved every LOG_FLUSH_INTERVAL entries) and in-memory summaries
+        self.summarized_urls[url] = filename
+        self._summary_cache[filename] = (url, formatted_summary.encode('utf-8'))
+        self._update_unique_entry(filename, url, self._summary_cache[filename][1])
+        self._unsaved_log_entries += 1
+        if self._unsaved_log_entries >= LOG_FLUSH_INTERVAL:
+            await self._save_log()
+        
+        return formatted_summary
+            
+    def _document_messages(self, doc) -> List[Dict[str, str]]:
+        """Build the LLM messages for summarizing a single document."""
+        return [
+            {"role": "system", "content": self.summary_prompt},
+            {"role": "human", "content": (
+                f"Read and analyze this content: {doc.page_content[:self._page_max_chars()]}\n\n"
+                "Now, provide a summary EXACTLY in this format:\n"
+                "Line 1: 'LLM should read this page when (2-3 specific scenarios)'\n"
+                "Line 2: '(Direct summary of main topics)'\n\n"
+                "FOLLOW THIS FORMAT PRECISELY. No additional text. Use parentheses () not square brackets []."
+            )}
+        ]
+        
+    def _page_max_chars(self, count: int = 1) -> Optional[int]:
+        """
+        Maximum characters of each page in a prompt of count pages, or None for the whole page.
+        
+        When a context window is configured, pages share what is left of it after the system
+        prompt, the instructions and the tokens reserved for the response, so the model never
+        has to drop the start of the prompt. Batched pages are also capped at BATCH_PAGE_MAX_CHARS.
+        """
+        if self.llm_num_ctx is None:
+            return BATCH_PAGE_MAX_CHARS if count > 1 else None
+        reserved_tokens = (
+            len(self.summary_prompt) // CHARS_PER_TOKEN
+            + PROMPT_OVERHEAD_TOKENS
+            + (self.llm_num_predict or 0)
+        )
+        available_chars = max(self.llm_num_ctx - reserved_tokens, 0) * CHARS_PER_TOKEN // count
+        return min(BATCH_PAGE_MAX_CHARS, available_chars) if count > 1 else available_chars
+        
+    def _fit_batch_size(self, batch_size: int) -> int:
+        """Largest batch size up to batch_size that keeps at least PAGE_MIN_CHARS of every page."""
+        while batch_size > 1 and self._page_max_chars(batch_size) < PAGE_MIN_CHARS:
+            batch_size -= 1
+        return batch_size
+        
+    def _batch_messages(self, docs) -> List[Dict[str, str]]:
+        """Build the LLM messages for summarizing several documents in one call (batch prompting)."""
+        page_max_chars = self._page_max_chars(len(docs))
+        pages = "\n\n".join(
+            f"[{n}]\n{doc.page_content[:page_max_chars]}"
+            for n, doc in enumerate(docs, start=1)
+        )
+        return [
+            {"role": "system", "content": self.summary_prompt},
+            {"role": "human", "content": (
+                f"Summarize each document:\n\n{pages}\n\n"
+                f"Output EXACTLY {len(docs)} summaries, numbered to match the documents:\n"
+                "[1] LLM should read this page when (2-3 specific scenarios)\n"
+                "(Direct summary of main topics)\n"
+                "[2] ...\n\n"
+                "FOLLOW THIS FORMAT PRECISELY. No additional text. "
+                "Apart from the [n] numbers, use parentheses () not square brackets []."
+            )}
+        ]
+        
+    @staticmethod
+    def _split_batch_response(content: str, count: int) -> Optional[List[str]]:
+        """Split a numbered batch response into per-document summaries, or None if it is not numbered 1..count."""
+        markers = list(_BATCH_MARKER_RE.finditer(content))
+        if [int(m.group(1)) for m in markers] != list(range(1, count + 1)):
             return None
             
+        ends = [m.start() for m in markers[1:]] + [len(content)]
+        blocks = [content[m.end():end].strip() for m, end in zip(markers, ends)]
+        return blocks if all(blocks) else None
+            
+    async def summarize_document(self, doc) -> Optional[str]:
+        """
+        Summarize a document.
+        
+        Args:
+            doc: Document to summarize
+            
+        Returns:
+            Summary of the document
+        """
+        skip, existing_summary = await self._get_existing_summary(doc)
+        if skip:
+            return existing_summary
+            
+        url = doc.metadata.get('source', '')
         try:
             print(f"Summarizing: {url}")
             
             # Generate summary
-            summary_response = self.llm.invoke([
-                {"role": "system", "content": self.summary_prompt},
-                {"role": "human", "content": (
-                    f"Read and analyze this content: {doc.page_content}\n\n"
-                    "Now, provide a summary EXACTLY in this format:\n"
-                    "Line 1: 'LLM should read this page when (2-3 specific scenarios)'\n"
-                    "Line 2: '(Direct summary of main topics)'\n\n"
-                    "FOLLOW THIS FORMAT PRECISELY. No additional text. Use parentheses () not square brackets []."
-                )}
-            ])
-            
-            summary = summary_response.content
-            
-            # Extract page title or use URL as fallback
-            # If we have a title from existing file, use that instead to preserve it
-            if url in self.url_titles:
-                title = self.url_titles[url]
-            else:
-                title = doc.metadata.get('title', url.split('/')[-1])
+            summary_response = (await self.llm.abatch([self._document_messages(doc)]))[0]
             
-            # Format summary entry - ensure no extra newlines within the summary
-            clean_summary = summary.replace('\n\n', ' ').replace('\n', ' ').strip()
-            formatted_summary = f"[{title}]({url}): {clean_summary}\n\n"
-            
-            # Save individual summary
-            filename = self._get_summary_filename(url)
-            with open(self.output_dir / filename, 'w') as f:
-                f.write(formatted_summary)
-                
-            # Update log
-            self.summarized_urls[url] = filename
-            self._save_log()
-            
-            return formatted_summary
+            return await self._save_summary(doc, summary_response.content)
             
         except Exception as e:
             print(f"Error summarizing {url}: {str(e)}")
             return None
+        finally:
+            await self._flush_log()
+            
+    def _update_unique_entry(self, filename: str, url: Optional[str], content: bytes) -> None:
+        """
+        Update the longest summary kept for a URL after a summary file was read or written.
+        
+        Args:
+            filename: Name of the summary file
+            url: URL extracted from the summary, or None to fall back to the filename
+            content: Content of the summary file
+        """
+        normalized_url = (url or filename).rstrip('/')
+        if self._is_blacklisted(normalized_url):
+            return
+            
+        current = self._unique_by_url.get(normalized_url)
+        if current is None or len(content) > len(current[1]):
+            self._unique_by_url[normalized_url] = (filename, content)
+        elif current[0] == filename:
+            # The kept file was rewritten with a shorter summary, so pick the longest file for this URL again
+            self._unique_by_url[normalized_url] = max(
+                (
+                    (name, file_content)
+                    for name, (file_url, file_content) in self._summary_cache.items()
+                    if (file_url or name).rstrip('/') == normalized_url
+                ),
+                key=lambda entry: len(entry[1]),
+            )
+            
+    def _write_sorted_progress(self, output_file: str) -> None:
+        """Write a sorted llms.txt from the per-URL summaries kept in memory, without re-deduplicating."""
+        output_basename = os.path.basename(output_file)
+        entries = sorted(
+            (url, content)
+            for url, (filename, content) in self._unique_by_url.items()
+            if filename != output_basename
+        )
+        _write_atomic(output_file, b"".join(content for _, content in entries))
+        print(f"Progress update: {output_file} with {len(entries)} unique summaries sorted by URL.")
+        
+    def _write_progress_llms_txt(self, summaries: List[str], preserve_structure: bool) -> None:
+        """Regenerate llms.txt from the summaries completed so far."""
+        update_mode = "structure-preserving" if preserve_structure else "sorted"
+        print(f"Progress: {len(summaries)} documents summarized. Generating {update_mode} llms.txt...")
+        
+        # Use a temporary path to avoid conflicts with the final output
+        temp_output = os.path.join(os.path.dirname(self.output_dir), "llms.txt")
+        
+        if preserve_structure:
+            self.generate_structured_llms_txt(summaries, temp_output, self.file_structure)
+        else:
+            self._write_sorted_progress(temp_output)
+            
+    async def _summarize_groups(
+        self,
+        docs,
+        groups: List[List[int]],
+        results: List[Optional[str]],
+        max_concurrency: int,
+        preserve_structure: bool,
+        batch_size: int = 1,
+    ) -> List[int]:
+        """
+        Run one LLM call per group of document indices through the model's abatch_as_completed.
+        
+        Args:
+            docs: All documents being summarized
+            groups: Document indices to summarize together, one LLM call per group
+            results: Summaries aligned with docs, filled in as calls complete
+            max_concurrency: Maximum number of LLM calls in flight at once
+            preserve_structure: Whether progress updates preserve the existing llms.txt structure
+            batch_size: Configured batch size, recorded in the response cache for batched calls
+            
+        Returns:
+            Indices of documents whose batched response could not be split and need a retry
+        """
+        inputs = []
+        for group in groups:
+            if len(group) == 1:
+                print(f"Summarizing: {docs[group[0]].metadata.get('source', '')}")
+                inputs.append(self._document_messages(docs[group[0]]))
+            else:
+                batch = [docs[i] for i in group]
+                print(f"Summarizing batch of {len(batch)} pages: {', '.join(doc.metadata.get('source', '') for doc in batch)}")
+                inputs.append(self._batch_messages(batch))
+                
+        retry = []
+        async for index, response in self.llm.abatch_as_completed(
+            inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True
+        ):
+            group = groups[index]
+            if isinstance(response, Exception):
+                for i in group:
+                    print(f"Error summarizing {docs[i].metadata.get('source', '')}: {str(response)}")
+                continue
+                
+            if len(group) == 1:
+                blocks = [response.content]
+                cache_mode = SINGLE_PROMPT_MODE
+            else:
+                blocks = self._split_batch_response(response.content, len(group))
+                if blocks is None:
+                    retry.extend(group)
+                    continue
+                cache_mode = self._batch_prompt_mode(batch_size)
+                    
+            previous_count = sum(1 for summary in results if summary)
+            saved = await asyncio.gather(*(
+                self._save_summary(docs[i], block, cache_mode=cache_mode) for i, block in zip(group, blocks)
+            ))
+            for i, summary in zip(group, saved):
+                results[i] = summary
+                
+            # Periodically update llms.txt (every 5 summaries) as calls complete
+            completed = [summary for summary in results if summary]
+            if len(completed) // 5 > previous_count // 5:
+                self._write_progress_llms_txt(completed, preserve_structure)
+                
+        return retry
             
-    async def summarize_all(self, docs) -> List[str]:
+    async def summarize_all(self, docs, max_concurrency: int = 10, batch_size: int = 1) -> List[str]:
         """
-        Summarize all documents.
+        Summarize all documents, running the LLM calls concurrently via abatch.
         
         Args:
             docs: List of documents to summarize
+            max_concurrency: Maximum number of LLM calls in flight at the same time
+            batch_size: Number of documents summarized per LLM call
             
         Returns:
-            List of summaries
+            List of summaries, in the same order as the documents
         """
-        summaries = []
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
         preserve_structure = self.existing_llms_file is not None and hasattr(self, 'file_structure')
         
-        for doc in docs:
-            try:
-                summary = await self.summarize_document(doc)
-                if summary:
-                    summaries.append(summary)
-                    # Periodically update llms.txt after each successful summary
-                    if len(summaries) % 5 == 0:
-                        update_mode = "structure-preserving" if preserve_structure else "sorted"
-                        print(f"Progress: {len(summaries)} documents summarized. Generating {update_mode} llms.txt...")
-                        
-                        # Use a temporary path to avoid conflicts with the final output
-                        temp_output = os.path.join(os.path.dirname(self.output_dir), "llms.txt")
-                        
-                        if preserve_structure:
-                            self.generate_structured_llms_txt(summaries, temp_output, self.file_structure)
-                        else:
-                            self.generate_llms_txt(summaries, temp_output)
-            except Exception as e:
-                url = doc.metadata.get('source', 'unknown')
-                print(f"Failed to summarize document {url}: {str(e)}")
-                # Continue with the next document
-                continue
+        # Make batches smaller when the context window cannot fit enough of every page
+        fitted_batch_size = self._fit_batch_size(batch_size)
+        if fitted_batch_size < batch_size:
+            print(
+                f"Batches of {batch_size} pages leave less than {PAGE_MIN_CHARS} characters per page "
+                f"in a {self.llm_num_ctx}-token context window, using batches of {fitted_batch_size}"
+            )
+            batch_size = fitted_batch_size
+            
+        # Resolve blacklisted, already summarized and cached documents without the LLM.
+        # Batched runs reuse responses from the same batch size, or from single-page prompts,
+        # which saw at least as much of each page; single-page runs never reuse batched responses
+        cache_modes = (SINGLE_PROMPT_MODE,)
+        if batch_size > 1:
+            cache_modes = (self._batch_prompt_mode(batch_size), SINGLE_PROMPT_MODE)
+        results: List[Optional[str]] = [None] * len(docs)
+        pending = []
+        existing = await asyncio.gather(*(self._get_existing_summary(doc, cache_modes) for doc in docs))
+        for i, (skip, existing_summary) in enumerate(existing):
+            if skip:
+                results[i] = existing_summary
+            else:
+                pending.append(i)
                 
-        return summaries
+        # Split the remaining documents into batches, one LLM call per batch
+        pending_iter = iter(pending)
+        groups = []
+        while group := list(islice(pending_iter, batch_size)):
+            groups.append(group)
+            
+        try:
+            retry = await self._summarize_groups(
+                docs, groups, results, max_concurrency, preserve_structure, batch_size
+            )
+            if retry:
+                print(f"{len(retry)} documents were not summarized in their batch, summarizing individually...")
+                await self._summarize_groups(docs, [[i] for i in retry], results, max_concurrency, preserve_structure)
+        finally:
+            # Record everything summarized so far, even if interrupted
+            await self._flush_log()
+            
+        return [summary for summary in results if summary]
         
-    def generate_llms_txt(self, summaries: List[str], output_file: str = "llms.txt") -> None:
+    def generate_llms_txt(self, summaries: List[str], output_file: str = "llms.txt", use_cache: bool = True) -> None:
         """
         Generate the final llms.txt file from all summaries.
         
         Args:
             summaries: List of summaries from current run
             output_file: File to save to
+            use_cache: If True, use the summaries kept in memory instead of re-reading the output directory
         """
         # Collect all available summaries from the output directory with their URLs
         summary_entries = []
+        summary_files = self._summary_cache if use_cache else self._read_summary_files()
+        output_basename = os.path.basename(output_file)
         
-        # Pattern to extract URL from summary
-        url_pattern = re.compile(r'\[(.*?)\]\((https?://[^\s)]+)\)')
-        
-        # First add all summaries from files
-        for filename in os.listdir(self.output_dir):
-            if filename.endswith('.txt') and filename != os.path.basename(output_file):
-                file_path = os.path.join(self.output_dir, filename)
-                with open(file_path, 'r') as f:
-                    summary_content = f.read()
-                    
-                    # Extract URL from summary content
-                    match = url_pattern.search(summary_content)
-                    url = match.group(2) if match else filename  # Use URL or filename as fallback
-                    
-                    # Normalize URL by removing trailing slash if present
-                    normalized_url = url.rstrip('/')
-                    
-                    # Store tuple of (normalized_url, content)
-                    summary_entries.append((normalized_url, summary_content))
+        for filename, (url, summary_content) in summary_files.items():
+            if filename != output_basename:
+                # Use URL or filename as fallback, normalized by removing trailing slash if present
+                normalized_url = (url or filename).rstrip('/')
+                
+                # Store tuple of (normalized_url, content)
+                summary_entries.append((normalized_url, summary_content))
         
-        # Group entries by normalized URL
-        url_to_entries = {}
+        # For each normalized URL, keep the best/most recent content in a single pass
+        # (We'll use the longest summary as a heuristic for "best")
+        best_by_url: Dict[str, bytes] = {}
+        blacklisted_count = 0
         for url, content in summary_entries:
-            # Skip blacklisted URLs
-            if url in self.blacklisted_urls:
+            # Skip (and count) blacklisted URLs
+            if self._is_blacklisted(url):
+                blacklisted_count += 1
                 continue
                 
-            if url not in url_to_entries:
-                url_to_entries[url] = []
-            url_to_entries[url].append(content)
+            current = best_by_url.get(url)
+            if current is None or len(content) > len(current):
+                best_by_url[url] = content
         
-        # For each URL, select the best/most recent content
-        # (We'll use the longest summary as a heuristic for "best")
-        unique_entries = []
-        for url, contents in url_to_entries.items():
-            # Sort by length in descending order (longest first)
-            contents.sort(key=len, reverse=True)
-            # Take the first (longest) entry
-            unique_entries.append((url, contents[0]))
-        
-        # Additional deduplication based on content
+        # Additional deduplication based on content, using 16-byte fingerprints instead of full contents
         final_entries = []
-        seen_content = set()
-        for url, content in unique_entries:
+        seen_content: Set[bytes] = set()
+        for url, content in best_by_url.items():
             # Skip exact duplicate content
-            if content not in seen_content:
+            fingerprint = hashlib.blake2b(content, digest_size=16).digest()
+            if fingerprint not in seen_content:
                 final_entries.append((url, content))
-                seen_content.add(content)
+                seen_content.add(fingerprint)
                 
         # Sort by URL
         sorted_entries = sorted(final_entries, key=lambda x: x[0])
         
-        # Write the sorted summaries to the output file
-        with open(output_file, 'w') as f:
-            for _, content in sorted_entries:
-                f.write(content)
+        # Write the sorted summaries to the output file in a single atomic write
+        _write_atomic(output_file, b"".join(content for _, content in sorted_entries))
         
-        # Get counts for logging
-        total_files = sum(1 for f in os.listdir(self.output_dir) 
-                          if f.endswith('.txt') and f != os.path.basename(output_file))
+        # Get counts for logging (one entry was collected per summary file)
+        total_files = len(summary_entries)
         duplicates_removed = total_files - len(sorted_entries)
         
-        # Count blacklisted URLs that were in the summary files
-        blacklisted_count = sum(1 for url, _ in summary_entries if url in self.blacklisted_urls)
-        
         # Customize message based on context - are we in progress or final output
         is_progress_update = not output_file.endswith(os.path.basename(output_file))
         message_prefix = "Progress update:" if is_progress_update else "Generated"
@@ -340,7 +757,13 @@ class Summarizer:
         if blacklisted_count > 0:
             print(f"Excluded {blacklisted_count} blacklisted URL entries.")
             
-    def generate_structured_llms_txt(self, summaries: List[str], output_file: str, file_structure: List[str]) -> None:
+    def generate_structured_llms_txt(
+        self,
+        summaries: List[str],
+        output_file: str,
+        file_structure: List[str],
+        use_cache: bool = True,
+    ) -> None:
         """
         Generate an llms.txt file that preserves the structure of the original file but updates descriptions.
         
@@ -348,40 +771,36 @@ class Summarizer:
             summaries: List of summaries from current run
             output_file: File to save to
             file_structure: Original file structure as a list of lines
+            use_cache: If True, use the summaries kept in memory instead of re-reading the output directory
         """
         # Build a map of URLs to their updated summaries
-        url_pattern = re.compile(r'\[(.*?)\]\((https?://[^\s)]+)\)')
         url_to_summary = {}
         
         # From newly generated summaries
         for summary in summaries:
-            match = url_pattern.search(summary)
-            if match:
-                url = match.group(2)
+            url = _first_md_link_url(summary)
+            if url:
                 url_to_summary[url] = summary.strip()
         
         # From summary files in the output directory
-        for filename in os.listdir(self.output_dir):
-            if filename.endswith('.txt') and filename != os.path.basename(output_file):
-                file_path = os.path.join(self.output_dir, filename)
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                    match = url_pattern.search(content)
-                    if match:
-                        url = match.group(2)
-                        if url not in url_to_summary:  # Don't overwrite newer summaries
-                            url_to_summary[url] = content.strip()
+        summary_files = self._summary_cache if use_cache else self._read_summary_files()
+        output_basename = os.path.basename(output_file)
+        for filename, (url, content) in summary_files.items():
+            if filename != output_basename and url:
+                if url not in url_to_summary:  # Don't overwrite newer summaries
+                    url_to_summary[url] = content.decode('utf-8').strip()
         
         # Create a new file with preserved structure but updated descriptions
         output_lines = []
         updated_count = 0
         preserved_count = 0
         
-        for line in file_structure:
+        # Index the URL on each line once, for both the rebuild and the final report
+        line_urls: List[Optional[str]] = [_first_md_link_url(line) for line in file_structure]
+        
+        for line, url in zip(file_structure, line_urls):
             # Check if line contains a URL that needs to be updated
-            match = url_pattern.search(line)
-            if match:
-                url = match.group(2)
+            if url:
                 # If we have an updated summary for this URL, use it
                 if url in url_to_summary:
                     output_lines.append(url_to_summary[url] + "\n")
@@ -394,9 +813,8 @@ class Summarizer:
                 # Keep the original line for structure (headers, blank lines, etc.)
                 output_lines.append(line)
         
-        # Write the updated file
-        with open(output_file, 'w') as f:
-            f.writelines(output_lines)
+        # Write the updated file in a single atomic write
+        _write_atomic(output_file, "".join(output_lines))
         
         # Customize message based on context - are we in progress or final output
         is_progress_update = not output_file.endswith(os.path.basename(output_file))
@@ -410,13 +828,7 @@ class Summarizer:
         # Only show detailed stats for final output, not progress updates
         if not is_progress_update:
             # Identify URLs in original file that were not updated
-            original_urls = []
-            for line in file_structure:
-                match = url_pattern.search(line)
-                if match:
-                    original_urls.append(match.group(2))
-                    
-            not_updated = [url for url in original_urls if url not in url_to_summary]
+            not_updated = [url for url in line_urls if url and url not in url_to_summary]
             if not_updated:
                 print(f"Warning: {len(not_updated)} URLs from original file were not updated:")
                 for url in not_updated[:5]:  # Show first 5 only
@@ -0,0 +1,155 @@
+"""Shared pytest fixtures for the test suite"""
+
+import functools
+import itertools
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+import pytest
+
+from llmstxt_architect.summarizer import OLLAMA_KEEP_ALIVE
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+UV_CACHE_DIR = REPO_DIR / ".uv-cache"
+SNAPSHOT_DIR = Path(__file__).resolve().parent / "fixtures" / "langgraph_snapshot"
+OLLAMA_HOST = "127.0.0.1"
+OLLAMA_PORT = 11434
+OLLAMA_URL = f"http://{OLLAMA_HOST}:{OLLAMA_PORT}"
+OLLAMA_MODEL = "llama3.2:latest"
+
+# Spawn options that let CPython start children with posix_spawn instead of fork + exec:
+# an executable path with a directory and no close_fds pass (Python's own fds are non-inheritable)
+SPAWN_KWARGS = {"close_fds": False}
+
+
+def pytest_configure(config):
+    """Put pytest's temporary directories on tmpfs when one is available"""
+    shm = "/dev/shm"
+    if sys.platform.startswith("linux") and "TMPDIR" not in os.environ and os.access(shm, os.W_OK):
+        os.environ["TMPDIR"] = shm
+        tempfile.tempdir = None  # Recompute gettempdir() from the new TMPDIR
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that does not log every request to stderr"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="session")
+def uv_env():
+    """Environment that keeps uv's cache, tools and entrypoints inside the repo"""
+    return {
+        **os.environ,
+        "UV_CACHE_DIR": str(UV_CACHE_DIR),
+        "UV_TOOL_DIR": str(UV_CACHE_DIR / "tools"),
+        "UV_TOOL_BIN_DIR": str(UV_CACHE_DIR / "bin"),
+        "UV_PYTHON_PREFERENCE": "only-system",
+    }
+
+
+@pytest.fixture(scope="session")
+def llmstxt_architect_bin(uv_env):
+    """Install this checkout as a uv tool once per session and return its entrypoint"""
+    uv = shutil.which("uv")
+    if uv is None:
+        pytest.skip("uv is not installed")
+    
+    # Only errors are of interest, so stdout goes to /dev/null instead of a pipe
+    subprocess.run(
+        [uv, "tool", "install", "--reinstall", str(REPO_DIR)],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        env=uv_env,
+        **SPAWN_KWARGS,
+    )
+    return str(Path(uv_env["UV_TOOL_BIN_DIR"]) / "llmstxt-architect")
+
+
+@pytest.fixture(scope="session")
+def llmstxt_architect_server(llmstxt_architect_bin, uv_env):
+    """
+    Start one `llmstxt-architect serve` process per session and return a job runner.
+    
+    The runner takes CLI arguments, sends them as a JSON job and returns the JSON result.
+    Job progress is written to the server's stderr, which is inherited from pytest.
+    """
+    job_ids = itertools.count(1)
+    
+    with subprocess.Popen(
+        [llmstxt_architect_bin, "serve"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+        env=uv_env,
+        **SPAWN_KWARGS,
+    ) as proc:
+        
+        def run(args):
+            job = {"id": next(job_ids), "args": [str(arg) for arg in args]}
+            proc.stdin.write(json.dumps(job) + "\n")
+            proc.stdin.flush()
+            line = proc.stdout.readline()
+            assert line, f"llmstxt-architect serve exited with code {proc.poll()}"
+            return json.loads(line)
+        
+        try:
+            yield run
+        finally:
+            # Closing stdin ends the serve loop
+            proc.stdin.close()
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+@pytest.fixture(scope="session")
+def langgraph_snapshot_url():
+    """Serve the frozen LangGraph docs snapshot locally and return its index URL"""
+    handler = functools.partial(_QuietHandler, directory=str(SNAPSHOT_DIR))
+    with ThreadingHTTPServer(("127.0.0.1", 0), handler) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://127.0.0.1:{server.server_port}/index.html"
+        finally:
+            server.shutdown()
+
+
+@pytest.fixture(scope="session")
+def ollama_max_concurrency():
+    """Concurrent LLM calls for Ollama runs, matching the server's OLLAMA_NUM_PARALLEL (default 4)"""
+    return os.environ.get("OLLAMA_NUM_PARALLEL", "4")
+
+
+@pytest.fixture(scope="session")
+def ollama_model():
+    """Load the Ollama test model once per session and return its name"""
+    # Skip quickly when no server is listening instead of waiting on client timeouts
+    try:
+        socket.create_connection((OLLAMA_HOST, OLLAMA_PORT), timeout=0.5).close()
+    except OSError:
+        pytest.skip(f"Ollama is not running on {OLLAMA_HOST}:{OLLAMA_PORT}")
+    
+    # An empty prompt only loads the model; the same keep_alive as the CLI keeps it resident for the run
+    response = httpx.post(
+        f"{OLLAMA_URL}/api/generate",
+        json={"model": OLLAMA_MODEL, "prompt": "", "keep_alive": OLLAMA_KEEP_ALIVE},
+        timeout=120,
+    )
+    if response.status_code == 404:
+        pytest.skip(f"Ollama model {OLLAMA_MODEL} is not pulled (run `ollama pull {OLLAMA_MODEL}`)")
+    response.raise_for_status()
+    return OLLAMA_MODEL
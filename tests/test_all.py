@@ -40,8 +40,8 @@ async def run_all_tests():
         print(f"STDOUT: {e.stdout}")
         print(f"STDERR: {e.stderr}")
     
-    # Test 2: UVX with Ollama
-    print("\nRunning Test 2: UVX with Ollama...")
+    # Test 2: Installed CLI (serve mode) with Ollama
+    print("\nRunning Test 2: Installed CLI (serve mode) with Ollama...")
     try:
         result = subprocess.run(
             ["python", os.path.join(current_dir, "test_uvx_ollama.py")],
@@ -103,6 +103,23 @@ async def run_all_tests():
         print("❌ Test 5 failed:")
         print(f"STDOUT: {e.stdout}")
         print(f"STDERR: {e.stderr}")
+        
+    # Test 6: Batch response parsing and blacklisting
+    print("\nRunning Test 6: Batch response parsing and blacklisting...")
+    try:
+        result = subprocess.run(
+            ["python", os.path.join(current_dir, "test_summarizer.py")],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        results["summarizer"] = True
+        print("✅ Test 6 passed!")
+    except subprocess.CalledProcessError as e:
+        results["summarizer"] = False
+        print("❌ Test 6 failed:")
+        print(f"STDOUT: {e.stdout}")
+        print(f"STDERR: {e.stderr}")
     
     # Print summary
     print("\nTest Summary:")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+"""Test batch response parsing and URL blacklisting (no network or LLM needed)"""
+
+import sys
+
+import pytest
+
+from llmstxt_architect.summarizer import PAGE_MIN_CHARS, Summarizer
+
+split = Summarizer._split_batch_response
+
+
+def test_split_numbered_response():
+    """Summaries numbered [1]..[K] are split in order, including multi-line summaries"""
+    content = "[1] LLM should read this page when a.\nSummary a.\n[2] Summary b.\n  [3]  Summary c.\n"
+    assert split(content, 3) == ["LLM should read this page when a.\nSummary a.", "Summary b.", "Summary c."]
+
+
+def test_split_ignores_preamble_and_inline_numbers():
+    """Text before [1] is dropped and [n] only counts as a marker at the start of a line"""
+    content = "Here are the summaries:\n[1] See [2] for details.\n[2] Summary b."
+    assert split(content, 2) == ["See [2] for details.", "Summary b."]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "[1] a\n[3] c",  # missing number
+        "[1] a\n[2] b",  # fewer summaries than pages
+        "[1] a\n[1] b\n[2] c",  # duplicate number
+        "[2] b\n[1] a\n[3] c",  # out of order
+        "[1] a\n[2] b\n[3] c\n[4] d",  # more summaries than pages
+        "[1] a\n[2]\n[3] c",  # empty summary
+        "a\n---\nb\n---\nc",  # unnumbered blocks
+    ],
+)
+def test_split_rejects_mismatched_numbering(content):
+    """Responses not numbered exactly 1..K are rejected so the pages are summarized individually"""
+    assert split(content, 3) is None
+
+
+@pytest.fixture
+def summarizer(tmp_path):
+    """Summarizer with exact and prefix blacklist entries"""
+    blacklist_file = tmp_path / "blacklist.txt"
+    blacklist_file.write_text(
+        "# Deprecated pages\n"
+        "https://example.com/old-page/\n"
+        "\n"
+        "https://example.com/api/v1/*\n"
+        "https://example.com/beta/*\n"
+    )
+    return Summarizer(
+        llm_name="llama3.2:latest",
+        llm_provider="ollama",
+        summary_prompt="Summarize",
+        output_dir=str(tmp_path / "summaries"),
+        blacklist_file=str(blacklist_file),
+    )
+
+
+@pytest.mark.parametrize(
+    "url, blacklisted",
+    [
+        # Exact entries match the URL itself, with or without a trailing slash
+        ("https://example.com/old-page", True),
+        ("https://example.com/old-page/", True),
+        ("https://example.com/old-page/child", False),
+        # Prefix entries match the URL and every page below it
+        ("https://example.com/api/v1", True),
+        ("https://example.com/api/v1/", True),
+        ("https://example.com/api/v1/auth", True),
+        ("https://example.com/api/v1/auth/tokens/", True),
+        ("https://example.com/beta/feature", True),
+        # Prefixes match whole path segments only
+        ("https://example.com/api/v10", False),
+        ("https://example.com/api/v10/auth", False),
+        ("https://example.com/api", False),
+        ("https://example.com/betamax", False),
+        ("https://example.org/api/v1/auth", False),
+    ],
+)
+def test_blacklist(summarizer, url, blacklisted):
+    """Blacklist entries match exactly unless they end with /*"""
+    assert summarizer._is_blacklisted(url) is blacklisted
+
+
+
+@pytest.mark.parametrize(
+    "llm_num_ctx, llm_num_predict, batch_size, fitted_batch_size",
+    [
+        (None, None, 8, 8),  # No context window configured
+        (4096, 1024, 4, 4),  # Room for 4 pages of 500+ characters each
+        (1536, 1024, 4, 2),  # Only room for 2 pages per batch
+        (1400, 1024, 4, 1),  # Too small for a batch, so pages are summarized individually
+    ],
+)
+def test_fit_batch_size(tmp_path, llm_num_ctx, llm_num_predict, batch_size, fitted_batch_size):
+    """Batches are made smaller until every page keeps at least PAGE_MIN_CHARS characters"""
+    summarizer = Summarizer(
+        llm_name="llama3.2:latest",
+        llm_provider="ollama",
+        summary_prompt="Summarize",
+        output_dir=str(tmp_path / "summaries"),
+        llm_num_ctx=llm_num_ctx,
+        llm_num_predict=llm_num_predict,
+    )
+    assert summarizer._fit_batch_size(batch_size) == fitted_batch_size
+    if llm_num_ctx is not None:
+        assert summarizer._page_max_chars(fitted_batch_size) >= PAGE_MIN_CHARS
+
+
+def test_context_window_without_room_for_a_page(tmp_path):
+    """A context window filled by the prompt and response budget is rejected"""
+    with pytest.raises(ValueError, match="llm_num_ctx"):
+        Summarizer(
+            llm_name="llama3.2:latest",
+            llm_provider="ollama",
+            summary_prompt="Summarize",
+            output_dir=str(tmp_path / "summaries"),
+            llm_num_ctx=1024,
+            llm_num_predict=1024,
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
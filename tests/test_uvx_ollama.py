@@ -1,65 +1,71 @@
 #!/usr/bin/env python
-"""Test UVX execution with Ollama LLM"""
+"""Test the installed CLI (serve mode) with Ollama LLM"""
 
 import os
-import shutil
-import subprocess
 import sys
-from pathlib import Path
 
+import pytest
 
-def test_uvx_ollama():
-    """Test UVX execution with Ollama LLM"""
-    # Set the project directory
-    project_dir = Path("tmp/uvx_ollama_test")
-    
-    # Create the project directory if it doesn't exist
-    os.makedirs(project_dir, exist_ok=True)
-    
-    # Run the UVX command
-    cmd = [
-        "uvx",
-        "--from", "llmstxt-architect",
-        "llmstxt-architect",
-        "--urls", "https://langchain-ai.github.io/langgraph/concepts",
-        "--max-depth", "1",
-        "--llm-name", "llama3.2:latest",
+
+def run_ollama_job(llmstxt_architect_server, url, ollama_model, max_concurrency, project_dir, max_depth, pages):
+    """Run a job against url with Ollama on the session server and check the generated files"""
+    args = [
+        "--urls", url,
+        "--max-depth", max_depth,
+        "--llm-name", ollama_model,
         "--llm-provider", "ollama",
-        "--project-dir", str(project_dir),
+        "--project-dir", project_dir,
+        "--batch-prompt-size", 4,
+        # Match concurrent LLM calls to the number of requests the Ollama server runs in parallel
+        "--max-concurrency", max_concurrency,
+        # Room for 4 summaries of up to 150 words each; batched pages are trimmed to fit the rest
+        "--llm-num-ctx", 4096,
+        "--llm-num-predict", 1024,
     ]
-    
-    try:
-        # Run the command and capture the output
-        result = subprocess.run(
-            cmd,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        print(result.stdout)
-        
-        # Check if the llms.txt file was created
-        assert (project_dir / "llms.txt").exists(), "llms.txt was not created"
-        
-        # Check if the summaries directory was created
-        assert (project_dir / "summaries").exists(), "summaries directory was not created"
-        
-        # Check if the summarized_urls.json file was created
-        assert (project_dir / "summaries" / "summarized_urls.json").exists(), "summarized_urls.json was not created"
-        
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Command failed with error: {e}")
-        print(f"STDOUT: {e.stdout}")
-        print(f"STDERR: {e.stderr}")
-        return False
-    finally:
-        # Clean up the test directory
-        if project_dir.exists():
-            shutil.rmtree(project_dir)
-            print(f"Cleaned up test directory: {project_dir}")
+
+    result = llmstxt_architect_server(args)
+    assert result["ok"], f"Job failed with error: {result.get('error')}"
+
+    # Read each output directory once and check the expected entries
+    entries = {e.name for e in os.scandir(project_dir)}
+    assert "llms.txt" in entries, "llms.txt was not created"
+    assert "summaries" in entries, "summaries directory was not created"
+
+    summaries = {e.name for e in os.scandir(project_dir / "summaries")}
+    assert "summarized_urls.json" in summaries, "summarized_urls.json was not created"
+    summary_files = {name for name in summaries if name.endswith(".txt")}
+    assert len(summary_files) == pages, f"Expected {pages} page summaries, found {sorted(summary_files)}"
+
+
+def test_uvx_ollama(ollama_model, ollama_max_concurrency, llmstxt_architect_server, langgraph_snapshot_url, tmp_path):
+    """Test the installed CLI (serve mode) with Ollama LLM"""
+    # ollama_model is requested first so the test skips before installing the CLI when Ollama is down
+    # max-depth 1 loads only the index page, so a single page is summarized
+    run_ollama_job(
+        llmstxt_architect_server,
+        langgraph_snapshot_url,
+        ollama_model,
+        ollama_max_concurrency,
+        tmp_path / "uvx_ollama_test",
+        max_depth=1,
+        pages=1,
+    )
+
+
+@pytest.mark.slow
+def test_uvx_ollama_deep(ollama_model, ollama_max_concurrency, llmstxt_architect_server, langgraph_snapshot_url, tmp_path):
+    """Test the installed CLI (serve mode) with Ollama LLM over the index page and its child pages"""
+    # max-depth 2 loads the index page and its 2 child pages, which are summarized in one batch
+    run_ollama_job(
+        llmstxt_architect_server,
+        langgraph_snapshot_url,
+        ollama_model,
+        ollama_max_concurrency,
+        tmp_path / "uvx_ollama_deep_test",
+        max_depth=2,
+        pages=3,
+    )
 
 
 if __name__ == "__main__":
-    success = test_uvx_ollama()
-    sys.exit(0 if success else 1)
+    sys.exit(pytest.main([__file__, "-s"]))